@@ -1,16 +1,57 @@
 import os
+import sys
+import atexit
 import random
-import json
 import logging
+import functools
+import threading
 from datetime import datetime
 from typing import Dict, Optional
 import google.generativeai as genai
 
+import io_utils
+from q_table_store import QTableStore
+
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=256)
+def _state_key(bucket: int) -> str:
+    # Interned so every q_table lookup for a bucket reuses one key object
+    return sys.intern(f"len_{bucket}")
+
+
 class AIRewriter:
     """RL-optimized AI rewriting engine using Google Gemini"""
 
+    _PROMPTS = {
+        'dramatize': """Rewrite the following text in a dramatic style, enhancing emotional impact while retaining core meaning:
+
+{}
+
+""",
+        'summarize': """Summarize the following text in clear, concise language:
+
+{}
+
+""",
+        'formalize': """Rewrite the following text to a formal academic tone:
+
+{}
+
+""",
+        'expand': """Expand the following text by adding descriptive detail and elaboration:
+
+{}
+
+""",
+        'simplify': """Simplify the following text, keeping the main ideas but using plain language:
+
+{}
+
+"""
+    }
+
     def __init__(self):
         self.actions = [
             'dramatize',
@@ -20,19 +61,34 @@ class AIRewriter:
             'simplify'
         ]
         self.q_table = {}
+        # Greedy action per state, kept in step with q_table by update_q_value
+        self._best_action = {}
         self.learning_rate = 0.1
         self.gamma = 0.9
         self.epsilon = 0.2
+        self.epsilon_min = 0.05
+        self.epsilon_decay = 0.995
+        # Q changes smaller than this are treated as converged and not journaled
+        self.convergence_threshold = 1e-4
+        # Private generator: no shared module-level state between agents or threads
+        self._rng = random.Random()
+        # Serializes Q-table mutation, journal writes and compaction across worker threads
+        self._lock = threading.RLock()
         self.q_table_file = 'data/rewriter_q_table.json'
+        self.q_table_journal = 'data/rewriter_q_table.jsonl'
+        self._store = QTableStore(self.q_table_file, self.q_table_journal)
 
         # Initialize state_key attribute
         self.state_key = None
 
         # Ensure data directory exists
-        os.makedirs('data', exist_ok=True)
+        io_utils.ensure_dir(os.path.dirname(self.q_table_file))
 
         self.load_q_table()
 
+        self._store.open()
+        atexit.register(self.close)
+
         # Configure Gemini
         api_key = os.getenv('GOOGLE_API_KEY')
         if not api_key:
@@ -43,81 +99,103 @@ class AIRewriter:
         self.model = genai.GenerativeModel('gemini-1.5-flash')
 
     def load_q_table(self):
-        if os.path.exists(self.q_table_file):
-            try:
-                with open(self.q_table_file, 'r') as f:
-                    self.q_table = json.load(f)
-                logger.info(f"Loaded rewriter Q-table with {len(self.q_table)} states")
-            except Exception as e:
-                logger.error(f"Error loading Q-table: {e}")
-                self.q_table = {}
-        else:
-            self.q_table = {}
-
-    def save_q_table(self):
+        self._best_action = {}
         try:
-            os.makedirs(os.path.dirname(self.q_table_file), exist_ok=True)
-            with open(self.q_table_file, 'w') as f:
-                json.dump(self.q_table, f, indent=2)
-            logger.info(f"Saved rewriter Q-table with {len(self.q_table)} states")
+            self.q_table = self._store.load_snapshot()
+            logger.info(f"Loaded rewriter Q-table with {len(self.q_table)} states")
         except Exception as e:
-            logger.error(f"Error saving Q-table: {e}")
-
-    def choose_action(self, state_key: str):
-        if state_key not in self.q_table:
-            self.q_table[state_key] = {a: 0.0 for a in self.actions}
-
-        if random.random() < self.epsilon:
-            return random.choice(self.actions)
-        else:
-            return max(self.q_table[state_key].items(), key=lambda x: x[1])[0]
-
-    def update_q_value(self, state_key: str, action: str, reward: float):
-        if state_key not in self.q_table:
-            self.q_table[state_key] = {a: 0.0 for a in self.actions}
-
-        old_q = self.q_table[state_key][action]
-        new_q = old_q + self.learning_rate * (reward - old_q)
-        self.q_table[state_key][action] = new_q
+            logger.error(f"Error loading Q-table: {e}")
+            self.q_table = {}
 
-        # Save Q-table after every update (not just every 10)
-        self.save_q_table()
+        self.replay_journal()
 
-        logger.info(f"Updated Q-value for {action} at {state_key}: {old_q:.3f} -> {new_q:.3f}")
+    def replay_journal(self):
+        """Apply Q updates journaled since the last snapshot"""
+        replayed = 0
+        for record in self._store.journal_records():
+            if 'e' in record:
+                self.epsilon = record['e']
+            if 's' in record:
+                self._state_row(record['s'])[record['a']] = record['q']
+                replayed += 1
 
-    def generate_prompt(self, action: str, content: str) -> str:
-        prompts = {
-            'dramatize': f"""Rewrite the following text in a dramatic style, enhancing emotional impact while retaining core meaning:
+        if replayed:
+            logger.info(f"Replayed {replayed} journaled rewriter Q updates")
 
-{content}
+    def save_q_table(self):
+        with self._lock:
+            try:
+                # The JSON snapshot has no room for epsilon, so it seeds the fresh journal
+                self._store.compact(self.q_table, seed={'e': self.epsilon})
 
-""",
-            'summarize': f"""Summarize the following text in clear, concise language:
+                logger.info(f"Saved rewriter Q-table with {len(self.q_table)} states")
+            except Exception as e:
+                logger.error(f"Error saving Q-table: {e}")
+
+    def close(self):
+        """Compact the Q-table and release the journal descriptor"""
+        with self._lock:
+            if not self._store.is_open:
+                return
+            self.save_q_table()
+            self._store.close()
+
+    def _state_row(self, state_key: str) -> Dict[str, float]:
+        row = self.q_table.get(state_key)
+        if row is None:
+            row = self.q_table[state_key] = dict.fromkeys(self.actions, 0.0)
+        return row
+
+    def _greedy_action(self, state_key: str) -> str:
+        best = self._best_action.get(state_key)
+        if best is None:
+            # Filled under the lock so a concurrent update can't leave a stale leader cached
+            with self._lock:
+                best = self._best_action.get(state_key)
+                if best is None:
+                    row = self._state_row(state_key)
+                    best = self._best_action[state_key] = max(row, key=row.__getitem__)
+        return best
 
-{content}
+    def choose_action(self, state_key: str):
+        if self._rng.random() < self.epsilon:
+            self._state_row(state_key)
+            return self._rng.choice(self.actions)
+        else:
+            return self._greedy_action(state_key)
 
-""",
-            'formalize': f"""Rewrite the following text to a formal academic tone:
+    def update_q_value(self, state_key: str, action: str, reward: float):
+        with self._lock:
+            row = self._state_row(state_key)
 
-{content}
+            old_q = row[action]
+            new_q = old_q + self.learning_rate * (reward - old_q)
+            row[action] = new_q
 
-""",
-            'expand': f"""Expand the following text by adding descriptive detail and elaboration:
+            best = self._best_action.get(state_key)
+            if best == action and new_q < old_q:
+                # The greedy action lost value; another action may now lead
+                del self._best_action[state_key]
+            elif best is not None and new_q > row[best]:
+                self._best_action[state_key] = action
 
-{content}
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
 
-""",
-            'simplify': f"""Simplify the following text, keeping the main ideas but using plain language:
+            # Converged values skip the journal, the next snapshot still carries them
+            if abs(new_q - old_q) >= self.convergence_threshold:
+                record = {'s': state_key, 'a': action, 'q': new_q, 'e': self.epsilon}
+                if self._store.append(record):
+                    self.save_q_table()
 
-{content}
+            logger.info(f"Updated Q-value for {action} at {state_key}: {old_q:.3f} -> {new_q:.3f}")
 
-"""
-        }
-        return prompts.get(action, content)
+    def generate_prompt(self, action: str, content: str) -> str:
+        template = self._PROMPTS.get(action)
+        return template.format(content) if template is not None else content
 
     def rewrite_content(self, content: str, strategy: str = 'auto') -> Dict:
         # Create state key based on content characteristics
-        state_key = f"len_{len(content)//500}"
+        state_key = _state_key(len(content) // 500)
 
         # IMPORTANT: Set the state_key attribute so app.py can access it
         self.state_key = state_key
@@ -168,24 +246,24 @@ class AIRewriter:
 
         # Try to get the actual state and action from stored content
         content_file = f"data/content/{content_id}.json"
-        if os.path.exists(content_file):
-            try:
-                with open(content_file, 'r') as f:
-                    content_data = json.load(f)
+        try:
+            content_data = io_utils.read_json(content_file)
 
-                state_key = content_data.get('metadata', {}).get('rewrite_state')
-                action = content_data.get('metadata', {}).get('rewrite_action')
+            state_key = content_data.get('metadata', {}).get('rewrite_state')
+            action = content_data.get('metadata', {}).get('rewrite_action')
 
-                if state_key and action:
-                    self.update_q_value(state_key, action, reward)
-                    return f"Updated Q-value for action {action} at state {state_key} with reward {reward}"
+            if state_key and action:
+                self.update_q_value(state_key, action, reward)
+                return f"Updated Q-value for action {action} at state {state_key} with reward {reward}"
 
-            except Exception as e:
-                logger.error(f"Error reading content file: {e}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error reading content file: {e}")
 
         # Fallback to generic state
         state_key = 'generic_state'
-        action = random.choice(self.actions)
+        action = self._rng.choice(self.actions)
         self.update_q_value(state_key, action, reward)
         return f"Updated Q-value for action {action} with reward {reward}"
 
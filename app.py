@@ -5,21 +5,21 @@ An agentic RL+LLM workflow for:
 3. Human feedback that updates the RL agents
 """
 
-import os
-import json
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 
 from rl_scraper import RLScraper
 from ai_rewriter import AIRewriter
 from content_storage import ContentStorage
 from config_manager import ConfigManager
+import io_utils
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger("SmartBookPublisher")
 
-os.makedirs('data/content', exist_ok=True)
-os.makedirs('screenshots', exist_ok=True)
+io_utils.ensure_dir('data/content')
+io_utils.ensure_dir('screenshots')
 
 cfg = ConfigManager()
 scraper = RLScraper()
@@ -44,7 +44,7 @@ def workflow_scrape(url: Optional[str] = None) -> Optional[str]:
     metadata = {
         "source_url": url,
         "scrape_action": result["strategy"],
-        "scrape_state": scraper.state_to_key(scraper.get_page_state(result["html"], url)),
+        "scrape_state": result["state_key"],
         "phase": "raw"
     }
 
@@ -58,14 +58,11 @@ def workflow_scrape(url: Optional[str] = None) -> Optional[str]:
     return cid
 
 def workflow_rewrite(content_id: str) -> Optional[str]:
-    record_path = os.path.join("data", "content", f"{content_id}.json")
-    if not os.path.exists(record_path):
+    record = storage.load_content(content_id)
+    if record is None:
         print("❌ Invalid content ID.")
         return None
 
-    with open(record_path, "r") as f:
-        record = json.load(f)
-
     base_text = record["content"]
     content_meta = record["metadata"]
 
@@ -98,15 +95,54 @@ def workflow_rewrite(content_id: str) -> Optional[str]:
 
     return new_cid
 
+def _rewrite_record(content_id: str, strategy: str) -> Tuple[str, Dict]:
+    record = storage.load_content(content_id)
+    rewrite_result = rewriter.rewrite_content(record["content"], strategy=strategy)
+
+    metadata = {
+        "parent_id": content_id,
+        "rewrite_action": rewrite_result["strategy"],
+        "rewrite_state": rewrite_result["state_key"],
+        "phase": "rewrite"
+    }
+    new_cid = storage.store_content(rewrite_result["rewritten_content"], content_type="rewrite", metadata=metadata)
+    return new_cid, rewrite_result
+
+def workflow_batch_rewrite(content_ids: List[str], strategy: str = "auto", max_workers: int = 8) -> List[str]:
+    valid_ids = []
+    for cid in content_ids:
+        if not storage.has_content(cid):
+            print(f"❌ Invalid content ID: {cid}")
+            continue
+        valid_ids.append(cid)
+
+    if not valid_ids:
+        return []
+
+    # Each rewrite spends nearly all its time waiting on Gemini, so threads overlap the latencies
+    log.info(f"Rewriting {len(valid_ids)} records with {max_workers} workers")
+    new_ids = []
+    with storage.batch(), ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_rewrite_record, cid, strategy): cid for cid in valid_ids}
+        for future in as_completed(futures):
+            cid = futures[future]
+            try:
+                new_cid, rewrite_result = future.result()
+            except Exception as e:
+                log.error("❌ Rewrite of %s failed: %s", cid, e)
+                continue
+            new_ids.append(new_cid)
+            print(f" {cid} → {new_cid} | {rewrite_result['strategy']:<10} | reward {rewrite_result['rl_reward']:+.2f}")
+
+    print(f"\n✅ Batch rewrite finished: {len(new_ids)} new records")
+    return new_ids
+
 def workflow_feedback(content_id: str, rating: int, comments: str = ""):
-    record_path = os.path.join("data", "content", f"{content_id}.json")
-    if not os.path.exists(record_path):
+    record = storage.load_content(content_id)
+    if record is None:
         print("❌ Invalid content ID.")
         return
 
-    with open(record_path, "r") as f:
-        record = json.load(f)
-
     content = record["content"]
     meta = record["metadata"]
     phase = meta.get("phase", "rewrite")
@@ -119,23 +155,18 @@ def workflow_feedback(content_id: str, rating: int, comments: str = ""):
             print("⚠ Missing scrape metadata.")
             return
 
-        state_parts = state_key.split("_")
-        if len(state_parts) >= 4:
-            dummy_state = {
-                "text_length": int(state_parts[0]) * 1000,
-                "has_javascript": state_parts[1] == "True",
-                "has_captcha": state_parts[2] == "True", 
-                "page_complexity": int(state_parts[3])
-            }
-        else:
-            dummy_state = {
+        try:
+            state_key = scraper.coerce_state_key(state_key)
+        except ValueError:
+            # Unrecognized legacy metadata: fall back to a typical page
+            state_key = scraper.state_to_key({
                 "text_length": 10000,
                 "has_javascript": False,
                 "has_captcha": False,
                 "page_complexity": 3
-            }
+            })
 
-        scraper.update_q_value(dummy_state, action, reward)
+        scraper.update_q_value_for_key(state_key, action, reward)
         target = "scraper"
     else:
         action = meta.get("rewrite_action")
@@ -154,25 +185,15 @@ def show_q_table_status():
     """Show current Q-table status"""
     print("\n📊 Q-Table Status:")
 
-    rewriter_file = "data/rewriter_q_table.json"
-    if os.path.exists(rewriter_file):
-        with open(rewriter_file, 'r') as f:
-            rewriter_q = json.load(f)
-        print(f"  Rewriter Q-table: {len(rewriter_q)} states")
-        for state, actions in rewriter_q.items():
-            print(f"    {state}: {actions}")
-    else:
-        print("  Rewriter Q-table: Not found")
-
-    scraper_file = "data/scraper_q_table.json"
-    if os.path.exists(scraper_file):
-        with open(scraper_file, 'r') as f:
-            scraper_q = json.load(f)
-        print(f"  Scraper Q-table: {len(scraper_q)} states")
-        for state, actions in scraper_q.items():
-            print(f"    {state}: {actions}")
-    else:
-        print("  Scraper Q-table: Not found")
+    # The live agents already hold the snapshot plus any journaled updates, so
+    # there is no need to re-read and parse the files from disk
+    for name, q_table in (("Rewriter", rewriter.q_table), ("Scraper", scraper.q_table)):
+        if q_table:
+            print(f"  {name} Q-table: {len(q_table)} states")
+            for state, actions in q_table.items():
+                print(f"    {state}: {actions}")
+        else:
+            print(f"  {name} Q-table: No learning data yet")
 
 
 def main():
@@ -184,8 +205,9 @@ def main():
         print(" 2. Rewrite existing content (by ID)")
         print(" 3. Provide feedback (by ID)")
         print(" 4. Show Q-table status")
-        print(" 5. Exit")
-        choice = input("Enter choice [1-5]: ").strip()
+        print(" 5. Batch rewrite content (by IDs)")
+        print(" 6. Exit")
+        choice = input("Enter choice [1-6]: ").strip()
 
         if choice == "1":
             workflow_scrape()
@@ -203,6 +225,9 @@ def main():
         elif choice == "4":
             show_q_table_status()
         elif choice == "5":
+            ids = input("Enter content IDs to rewrite (comma-separated): ")
+            workflow_batch_rewrite([cid.strip() for cid in ids.split(",") if cid.strip()])
+        elif choice == "6":
             print("Buy Buy")
             break
         else:
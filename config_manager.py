@@ -48,8 +48,20 @@ class ConfigManager:
             logger.warning('config.yaml not found. Creating default config.')
             config = DEFAULT_CONFIG
             self.save_config(config)
+        self._flat = self._flatten(config or {})
         return config
 
+    @staticmethod
+    def _flatten(node, prefix=''):
+        """Map every dotted key path ('scraper', 'scraper.timeout', ...) to its value"""
+        flat = {}
+        for key, value in node.items():
+            path = f'{prefix}{key}'
+            flat[path] = value
+            if isinstance(value, dict):
+                flat.update(ConfigManager._flatten(value, f'{path}.'))
+        return flat
+
     def save_config(self, config=None):
         if config is None:
             config = self.config
@@ -61,8 +73,4 @@ class ConfigManager:
             logger.error(f'Error saving config: {e}')
 
     def get(self, key_path, default=None):
-        keys = key_path.split('.')
-        node = self.config
-        for k in keys:
-            node = node.get(k, {})
-        return node or default
+        return self._flat.get(key_path, default)
@@ -1,26 +1,173 @@
 
 import os
-import json
 import uuid
+import contextlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 import logging
 
+import io_utils
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; feedback writes are then only serialized within a process
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 DATA_DIR = 'data'
 CONTENT_DIR = os.path.join(DATA_DIR, 'content')
-FEEDBACK_FILE = os.path.join(DATA_DIR, 'feedback.json')
+FEEDBACK_FILE = os.path.join(DATA_DIR, 'feedback.jsonl')
+LEGACY_FEEDBACK_FILE = os.path.join(DATA_DIR, 'feedback.json')
+# One line of listing fields per stored record, so listings never open the records themselves
+CONTENT_INDEX_FILE = os.path.join(DATA_DIR, 'content_index.jsonl')
+# Running {sum, count} of feedback ratings, so averages don't rescan the feedback log
+FEEDBACK_AGG_FILE = os.path.join(DATA_DIR, 'feedback_agg.json')
+RECORD_CACHE_SIZE = 128
+
+io_utils.ensure_dir(CONTENT_DIR)
+
+# One-time migration of the old single-array feedback file to one record per line
+if os.path.exists(LEGACY_FEEDBACK_FILE) and not os.path.exists(FEEDBACK_FILE):
+    legacy_feedback = io_utils.read_json(LEGACY_FEEDBACK_FILE)
+    with open(FEEDBACK_FILE, 'wb') as f:
+        f.write(b''.join(io_utils.dumps_line(item) for item in legacy_feedback))
+    os.remove(LEGACY_FEEDBACK_FILE)
+    logger.info(f'Migrated {len(legacy_feedback)} feedback records to {FEEDBACK_FILE}')
+
+
+def _iter_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, 'rb') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield io_utils.loads(line)
+            except ValueError:
+                # A torn line from an interrupted append; the rest of the file is still good
+                logger.warning(f'Skipping unreadable line {line_no} of {path}')
+
+
+# One-time build of the rating aggregate for feedback stored before it existed
+if not os.path.exists(FEEDBACK_AGG_FILE):
+    feedback_agg = {'sum': 0, 'count': 0}
+    if os.path.exists(FEEDBACK_FILE):
+        for item in _iter_jsonl(FEEDBACK_FILE):
+            feedback_agg['sum'] += item['rating']
+            feedback_agg['count'] += 1
+    io_utils.write_json(FEEDBACK_AGG_FILE, feedback_agg)
+
+
+def _index_entry(record: Dict) -> Dict:
+    return {
+        'id': record['id'],
+        'type': record['type'],
+        'source_url': record['metadata'].get('source_url'),
+        'timestamp': record['timestamp']
+    }
+
+
+# One-time build of the index for records stored before it existed
+if not os.path.exists(CONTENT_INDEX_FILE):
+    entries = []
+    for name in os.listdir(CONTENT_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            entries.append(_index_entry(io_utils.read_json(os.path.join(CONTENT_DIR, name))))
+        except Exception as e:
+            # A truncated or malformed record is left out of the index, not fatal
+            logger.warning(f'Skipping unreadable content file {name}: {e}')
+    entries.sort(key=lambda entry: entry['timestamp'])
+    with open(CONTENT_INDEX_FILE, 'wb') as f:
+        f.write(b''.join(io_utils.dumps_line(entry) for entry in entries))
+    if entries:
+        logger.info(f'Indexed {len(entries)} existing content records in {CONTENT_INDEX_FILE}')
+
+# Entropy for content IDs is read from the OS in blocks rather than 16 bytes per record
+_ID_BYTES = 16
+_ID_POOL_SIZE = 256
+_id_lock = threading.Lock()
+_id_pool = b''
+_id_offset = 0
+
+
+def _reset_id_pool():
+    global _id_pool, _id_offset
+    _id_pool, _id_offset = b'', 0
+
+
+if hasattr(os, 'register_at_fork'):
+    # A forked child must not hand out the same IDs as its parent
+    os.register_at_fork(after_in_child=_reset_id_pool)
+
+
+def _new_content_id() -> str:
+    """A random (version 4) UUID string, same format as str(uuid.uuid4())"""
+    global _id_pool, _id_offset
+    with _id_lock:
+        if _id_offset >= len(_id_pool):
+            _id_pool, _id_offset = os.urandom(_ID_BYTES * _ID_POOL_SIZE), 0
+        chunk = _id_pool[_id_offset:_id_offset + _ID_BYTES]
+        _id_offset += _ID_BYTES
+    return str(uuid.UUID(bytes=chunk, version=4))
 
-os.makedirs(CONTENT_DIR, exist_ok=True)
-if not os.path.exists(FEEDBACK_FILE):
-    with open(FEEDBACK_FILE, 'w') as f:
-        json.dump([], f)
 
 class ContentStorage:
     """Simple JSON-based storage for content and feedback"""
+
+    def __init__(self):
+        # Listed once so most existence checks don't need a stat(); a miss still
+        # checks the disk, since another process may have stored the record since
+        self._known_ids = {name[:-5] for name in os.listdir(CONTENT_DIR) if name.endswith('.json')}
+        # Paths stored inside each open batch() scope; fsync is deferred so a batch pays it once
+        self._batches = []
+        self._batch_lock = threading.Lock()
+        # Recently stored/loaded records, most recent last; a record is typically
+        # read back right after being written (rewrite, then feedback)
+        self._record_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._feedback_lock = threading.Lock()
+
+    def _cache_record(self, record: Dict):
+        with self._cache_lock:
+            self._record_cache[record['id']] = record
+            self._record_cache.move_to_end(record['id'])
+            if len(self._record_cache) > RECORD_CACHE_SIZE:
+                self._record_cache.popitem(last=False)
+
+    def load_content(self, content_id: str) -> Optional[Dict]:
+        """Return a stored record (treat as read-only), or None for an unknown ID"""
+        with self._cache_lock:
+            record = self._record_cache.get(content_id)
+            if record is not None:
+                self._record_cache.move_to_end(content_id)
+                return record
+        try:
+            record = io_utils.read_json(os.path.join(CONTENT_DIR, f"{content_id}.json"))
+        except FileNotFoundError:
+            return None
+        self._known_ids.add(content_id)
+        self._cache_record(record)
+        return record
+
+    def list_content(self) -> Iterator[Dict]:
+        """Stream {id, type, source_url, timestamp} for every stored record, oldest first"""
+        yield from _iter_jsonl(CONTENT_INDEX_FILE)
+
+    def has_content(self, content_id: str) -> bool:
+        if content_id in self._known_ids:
+            return True
+        if os.path.exists(os.path.join(CONTENT_DIR, f"{content_id}.json")):
+            self._known_ids.add(content_id)
+            return True
+        return False
+
     def store_content(self, content: str, content_type: str, metadata: Dict) -> str:
-        content_id = str(uuid.uuid4())
+        content_id = _new_content_id()
         file_path = os.path.join(CONTENT_DIR, f"{content_id}.json")
         record = {
             'id': content_id,
@@ -29,23 +176,62 @@ class ContentStorage:
             'metadata': metadata,
             'timestamp': datetime.now().isoformat()
         }
-        with open(file_path, 'w') as f:
-            json.dump(record, f, indent=2)
+        io_utils.write_json(file_path, record, indent=True)
+        with open(CONTENT_INDEX_FILE, 'ab') as f:
+            f.write(io_utils.dumps_line(_index_entry(record)))
+        self._known_ids.add(content_id)
+        with self._batch_lock:
+            for pending in self._batches:
+                pending.append(file_path)
+        self._cache_record(record)
         logger.info(f'Saved {content_type} content with id {content_id}')
         return content_id
 
+    @contextlib.contextmanager
+    def batch(self):
+        """Make every record stored inside the block durable on disk, with one fsync pass at its end"""
+        pending = []
+        with self._batch_lock:
+            self._batches.append(pending)
+        try:
+            yield
+        finally:
+            with self._batch_lock:
+                self._batches = [paths for paths in self._batches if paths is not pending]
+            if pending:
+                io_utils.fsync_paths(pending, CONTENT_DIR)
+                logger.info(f'Synced {len(pending)} content records to disk')
+
     def store_feedback(self, content_id: str, rating: int, comments: str = None):
-        with open(FEEDBACK_FILE, 'r') as f:
-            feedback_data = json.load(f)
-        feedback_data.append({
+        record = {
             'content_id': content_id,
             'rating': rating,
             'comments': comments,
             'timestamp': datetime.now().isoformat()
-        })
-        with open(FEEDBACK_FILE, 'w') as f:
-            json.dump(feedback_data, f, indent=2)
+        }
+        with self._feedback_lock, open(FEEDBACK_FILE, 'ab') as f:
+            # The CLI and the Streamlit app may both record feedback; the log's lock
+            # keeps their read-modify-write of the aggregate from interleaving
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(io_utils.dumps_line(record))
+            agg = io_utils.read_json(FEEDBACK_AGG_FILE)
+            agg['sum'] += rating
+            agg['count'] += 1
+            io_utils.write_json(FEEDBACK_AGG_FILE, agg)
         logger.info(f'Stored feedback for content {content_id}')
 
+    def load_feedback(self) -> Iterator[Dict]:
+        """Stream stored feedback records, oldest first"""
+        try:
+            yield from _iter_jsonl(FEEDBACK_FILE)
+        except FileNotFoundError:
+            return
+
+    def average_rating(self) -> float:
+        """Mean of all feedback ratings, or 0.0 before any feedback"""
+        agg = io_utils.read_json(FEEDBACK_AGG_FILE)
+        return agg['sum'] / agg['count'] if agg['count'] else 0.0
+
     def is_healthy(self):
         return os.path.isdir(CONTENT_DIR)
@@ -0,0 +1,88 @@
+import os
+import json
+import tempfile
+import logging
+import functools
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+if orjson is None:
+    logger.info('orjson not installed, falling back to stdlib json')
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def dumps_line(obj) -> bytes:
+    """Serialize obj as one newline-terminated JSON Lines record"""
+    if orjson is not None:
+        # orjson appends the newline itself instead of copying the output to add it
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=None)
+def ensure_dir(path: str):
+    """Create a directory (and parents) at most once per process"""
+    os.makedirs(path, exist_ok=True)
+
+
+def read_json(path: str):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def write_json(path: str, obj, indent: bool = False, fsync: bool = False):
+    """Atomically replace path with obj serialized as JSON"""
+    # Serialize fully in memory first so the file gets a single write() instead of
+    # the many small chunk writes json.dump issues
+    data = dumps(obj, indent=indent)
+    # A unique temp name, so processes writing the same file never share one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # mkstemp creates the file private; keep the usual mode (no fchmod on older Windows)
+            if hasattr(os, 'fchmod'):
+                os.fchmod(f.fileno(), 0o644)
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        # Readers see either the old file or the new one, never a torn write
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def fsync_paths(paths, directory: str):
+    """Flush a batch of written files, then their directory entries, to disk"""
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    # Directory fsync persists the renames; not supported on Windows
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
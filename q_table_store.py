@@ -0,0 +1,71 @@
+import os
+import logging
+from typing import Dict, Iterator, Optional
+
+import io_utils
+
+logger = logging.getLogger(__name__)
+
+
+class QTableStore:
+    """JSON snapshot of a Q-table plus an append-only journal of the updates made since"""
+
+    def __init__(self, snapshot_path: str, journal_path: str, compact_every: int = 50):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        # The full table is rewritten only once this many updates have been journaled
+        self.compact_every = compact_every
+        self._pending = 0
+        self._fd = None
+
+    def load_snapshot(self) -> Dict:
+        try:
+            return io_utils.read_json(self.snapshot_path)
+        except FileNotFoundError:
+            return {}
+
+    def journal_records(self) -> Iterator[Dict]:
+        """Yield journaled records, oldest first"""
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield io_utils.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write
+                    continue
+
+    @property
+    def is_open(self) -> bool:
+        return self._fd is not None
+
+    def open(self):
+        # One descriptor for the process lifetime: each append costs a single write()
+        if self._fd is None:
+            self._fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def append(self, record: Dict) -> bool:
+        """Journal one record; returns True once a compaction is due"""
+        os.write(self._fd, io_utils.dumps_line(record))
+        self._pending += 1
+        return self._pending >= self.compact_every
+
+    def compact(self, q_table: Dict, seed: Optional[Dict] = None):
+        """Write the full snapshot and restart the journal, optionally seeded with one record"""
+        # Compact encoding: the snapshot is machine-read and only rewritten here
+        io_utils.write_json(self.snapshot_path, q_table)
+
+        # The snapshot now covers everything journaled so far
+        self._pending = 0
+        if self._fd is not None:
+            os.ftruncate(self._fd, 0)
+            if seed is not None:
+                os.write(self._fd, io_utils.dumps_line(seed))
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
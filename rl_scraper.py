@@ -1,71 +1,154 @@
 
 import random
-import json
 import os
+import atexit
 import time
+import asyncio
+import threading
+import uuid
+from bisect import bisect_left
+from collections import deque
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from playwright.sync_api import sync_playwright
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
-import requests
+import lxml.html
+from lxml import etree
+import httpx
+try:
+    from curl_cffi.requests import AsyncSession as CurlAsyncSession
+except ImportError:
+    CurlAsyncSession = None
 import hashlib
 import logging
 
+from q_table_store import QTableStore
+
 logger = logging.getLogger(__name__)
 
+# lxml's C parser is several times faster than the pure-Python "html.parser"
+HTML_PARSER = "lxml"
+
+# Page-state features as precompiled XPath, evaluated in C instead of a Python-level tree walk
+_XP_TEXT_LENGTH = etree.XPath("string-length(/)")
+# Like BeautifulSoup's get_text(), script and style bodies aren't page text
+_XP_NON_TEXT = etree.XPath("//script|//style")
+_XP_HAS_CAPTCHA_ID = etree.XPath("boolean(//@id[. = 'captcha-challenge'])")
+# Only the few class attributes that could match; whole tokens are checked in Python
+_XP_HINT_CLASSES = etree.XPath("//@class[contains(., 'captcha') or contains(., 'loading')]", smart_strings=False)
+_XP_COUNT_P = etree.XPath("count(//p)")
+_XP_COUNT_IMG = etree.XPath("count(//img)")
+_XP_COUNT_ALL = etree.XPath("count(//*)")
+
+# Content-length scoring tables: bisect_left picks the band for "length > threshold"
+REWARD_LENGTH_THRESHOLDS = (500, 1000)
+REWARD_BY_LENGTH = (-0.5, 0.5, 1.0)
+QUALITY_LENGTH_THRESHOLDS = (100, 500, 1000, 2000)
+QUALITY_BY_LENGTH = (1.0, 2.0, 3.0, 4.0, 5.0)
+
+# Resources the text-only fast scrape never needs to download
+BLOCKED_RESOURCE_TYPES = frozenset(("image", "media", "font", "stylesheet"))
+
+
+async def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 class RLScraper:
 
     def __init__(self, config_path: str = "config.yaml"):
         self.actions = ["playwright_full", "playwright_fast", "playwright_js_wait", "requests_simple"]
+        if CurlAsyncSession is not None:
+            # Plain HTTP with a real browser's TLS fingerprint, for static pages that block httpx
+            self.actions.append("curl_cffi_impersonate")
         self.q_table = {}
         self.learning_rate = 0.1
         self.epsilon = 0.2  # Exploration
         self.gamma = 0.9  # Discount factor
+        # Private generator, independent of (and not perturbed by) other users of the random module
+        self._rng = random.Random()
 
         self.q_table_path = "data/scraper_q_table.json"
-        self.load_q_table()
-
-        self.performance_history = []
+        self.q_table_journal = "data/scraper_q_table.jsonl"
+        self._store = QTableStore(self.q_table_path, self.q_table_journal)
+        # Feedback updates arrive from the caller's thread while scrapes run on the event loop
+        self._q_lock = threading.RLock()
+
+        # Page state per domain, reused for later URLs on the same site to skip the probe fetch
+        self._domain_state = {}
+        self.domain_state_ttl = 300
+
+        # Last 100 scrapes, with running totals so stats don't rescan the history
+        self.performance_history = deque(maxlen=100)
+        self._success_total = 0
+        self._quality_total = 0.0
         self.screenshots_dir = "screenshots"
         os.makedirs(self.screenshots_dir, exist_ok=True)
         os.makedirs("data", exist_ok=True)
 
+        self.load_q_table()
+        self._store.open()
+        atexit.register(self.save_q_table)
+
+        # Playwright objects are bound to the event loop that created them, so the
+        # scraper owns one loop on a background thread and keeps the browser alive on it
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = None
+        self._http = None
+        self._curl = None
+        # playwright_fast skips images, media, fonts and CSS; playwright_full keeps full fidelity
+        self.fast_blocks_resources = True
+        atexit.register(self.close)
+
     def load_q_table(self):
-        if os.path.exists(self.q_table_path):
-            try:
-                with open(self.q_table_path, 'r') as f:
-                    self.q_table = json.load(f)
-                logger.info(f"Loaded Q-table with {len(self.q_table)} states")
-            except Exception as e:
-                logger.error(f"Error loading Q-table: {e}")
-                self.q_table = {}
-        else:
+        try:
+            # JSON object keys are always strings
+            self.q_table = {self.coerce_state_key(k): v for k, v in self._store.load_snapshot().items()}
+            logger.info(f"Loaded Q-table with {len(self.q_table)} states")
+        except Exception as e:
+            logger.error(f"Error loading Q-table: {e}")
             self.q_table = {}
 
+        # Replay updates made since the snapshot was written
+        replayed = 0
+        for record in self._store.journal_records():
+            self._state_row(self.coerce_state_key(record['s']))[record['a']] = record['q']
+            replayed += 1
+        if replayed:
+            logger.info(f"Replayed {replayed} journaled scraper Q updates")
+
     def save_q_table(self):
-        try:
-            with open(self.q_table_path, 'w') as f:
-                json.dump(self.q_table, f, indent=2)
-            logger.info(f"Saved Q-table with {len(self.q_table)} states")
-        except Exception as e:
-            logger.error(f"Error saving Q-table: {e}")
+        with self._q_lock:
+            try:
+                self._store.compact({str(k): v for k, v in self.q_table.items()})
+                logger.info(f"Saved Q-table with {len(self.q_table)} states")
+            except Exception as e:
+                logger.error(f"Error saving Q-table: {e}")
 
     def simulate_page_variants(self, html: str) -> str:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, HTML_PARSER)
 
-        if random.random() > 0.7:
+        if self._rng.random() > 0.7:
             paragraphs = soup.find_all("p")
             if paragraphs:
-                for p in paragraphs[:random.randint(1, min(3, len(paragraphs)))]:
+                for p in paragraphs[:self._rng.randint(1, min(3, len(paragraphs)))]:
                     p.decompose()
 
-        if random.random() > 0.8:
+        if self._rng.random() > 0.8:
             captcha = soup.new_tag("div", id="captcha-challenge")
             captcha.string = "Please verify you are human"
             if soup.body:
                 soup.body.insert(0, captcha)
 
-        if random.random() > 0.6:
+        if self._rng.random() > 0.6:
             loading = soup.new_tag("div", class_="loading")
             loading.string = "Loading..."
             if soup.body:
@@ -73,78 +156,195 @@ class RLScraper:
 
         return str(soup)
 
+    def _parse_tree(self, html: str):
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml rejects str input that carries an XML encoding declaration
+            return lxml.html.document_fromstring(html.encode("utf-8"))
+        except etree.ParserError:
+            # Empty document
+            return lxml.html.document_fromstring("<html></html>")
+
     def get_page_state(self, html: str, url: str) -> Dict:
-        soup = BeautifulSoup(html, "html.parser")
+        return self.get_page_state_from_tree(self._parse_tree(html), url)
 
-        # Extract page characteristics
-        text_content = soup.get_text()
+    def get_page_state_from_tree(self, tree, url: str) -> Dict:
+        non_text = _XP_NON_TEXT(tree)
+        has_captcha = _XP_HAS_CAPTCHA_ID(tree)
+        has_loading = False
+        for classes in _XP_HINT_CLASSES(tree):
+            class_list = classes.split()
+            has_captcha = has_captcha or "captcha" in class_list
+            has_loading = has_loading or "loading" in class_list
 
         state = {
-            "text_length": len(text_content),
-            "has_javascript": bool(soup.find("script")),
-            "has_captcha": bool(soup.find(id="captcha-challenge") or soup.find(class_="captcha")),
-            "has_loading": bool(soup.find(class_="loading")),
-            "num_paragraphs": len(soup.find_all("p")),
-            "num_images": len(soup.find_all("img")),
+            "text_length": int(_XP_TEXT_LENGTH(tree)) - sum(len(el.text or "") for el in non_text),
+            "has_javascript": any(el.tag == "script" for el in non_text),
+            "has_captcha": has_captcha,
+            "has_loading": has_loading,
+            "num_paragraphs": int(_XP_COUNT_P(tree)),
+            "num_images": int(_XP_COUNT_IMG(tree)),
             "is_wikisource": "wikisource" in url.lower(),
-            "page_complexity": min(10, len(soup.find_all()) // 10)
+            "page_complexity": min(10, int(_XP_COUNT_ALL(tree)) // 10)
         }
 
         return state
 
-    def state_to_key(self, state: Dict) -> str:
-        # Create a simplified state key
-        return f"{state['text_length']//1000}_{state['has_javascript']}_{state['has_captcha']}_{state['page_complexity']}"
+    def state_to_key(self, state: Dict) -> int:
+        # Pack the simplified state into one int: cheaper to hash than a formatted string
+        return (min(state['text_length'] // 1000, 0xFFFF)
+                | int(state['has_javascript']) << 16
+                | int(state['has_captcha']) << 17
+                | min(state['page_complexity'], 15) << 18)
+
+    def coerce_state_key(self, state_key) -> int:
+        """Normalize a state key read back from JSON, including legacy "len_js_captcha_complexity" strings"""
+        if isinstance(state_key, int):
+            return state_key
+        if state_key.isdigit():
+            return int(state_key)
+        length, has_js, has_captcha, complexity = state_key.split("_")
+        return self.state_to_key({
+            "text_length": int(length) * 1000,
+            "has_javascript": has_js == "True",
+            "has_captcha": has_captcha == "True",
+            "page_complexity": int(complexity)
+        })
+
+    def _state_row(self, state_key: int) -> Dict[str, float]:
+        # Initialize state if not seen before
+        row = self.q_table.get(state_key)
+        if row is None:
+            row = self.q_table[state_key] = dict.fromkeys(self.actions, 0.0)
+        elif len(row) < len(self.actions):
+            # Learned before an action was added
+            for action in self.actions:
+                row.setdefault(action, 0.0)
+        return row
 
     def choose_action(self, state: Dict) -> str:
-        state_key = self.state_to_key(state)
-
-        # Initialize state if not seen before
-        if state_key not in self.q_table:
-            self.q_table[state_key] = {action: 0.0 for action in self.actions}
+        row = self._state_row(self.state_to_key(state))
 
         # Epsilon-greedy selection
-        if random.random() < self.epsilon:
-            return random.choice(self.actions)  # Explore
+        if self._rng.random() < self.epsilon:
+            return self._rng.choice(self.actions)  # Explore
         else:
             # Exploit: choose action with highest Q-value
-            return max(self.q_table[state_key].items(), key=lambda x: x[1])[0]
+            return max(self.actions, key=row.__getitem__)
 
     def update_q_value(self, state: Dict, action: str, reward: float, next_state: Dict = None):
-        state_key = self.state_to_key(state)
+        next_key = self.state_to_key(next_state) if next_state else None
+        self.update_q_value_for_key(self.state_to_key(state), action, reward, next_key)
 
-        if state_key not in self.q_table:
-            self.q_table[state_key] = {action: 0.0 for action in self.actions}
+    def update_q_value_for_key(self, state_key: int, action: str, reward: float, next_key: Optional[int] = None):
+        with self._q_lock:
+            row = self._state_row(state_key)
 
-        old_q = self.q_table[state_key][action]
+            old_q = row[action]
 
-        if next_state:
-            next_state_key = self.state_to_key(next_state)
-            if next_state_key not in self.q_table:
-                self.q_table[next_state_key] = {action: 0.0 for action in self.actions}
-            max_next_q = max(self.q_table[next_state_key].values())
-            new_q = old_q + self.learning_rate * (reward + self.gamma * max_next_q - old_q)
-        else:
-            new_q = old_q + self.learning_rate * (reward - old_q)
-
-        self.q_table[state_key][action] = new_q
-
-        # Save Q-table periodically
-        if len(self.q_table) % 10 == 0:
-            self.save_q_table()
-
-    def execute_scraping_action(self, url: str, action: str) -> Dict:
+            if next_key is not None:
+                max_next_q = max(self._state_row(next_key).values())
+                new_q = old_q + self.learning_rate * (reward + self.gamma * max_next_q - old_q)
+            else:
+                new_q = old_q + self.learning_rate * (reward - old_q)
+
+            row[action] = new_q
+
+            if self._store.append({'s': state_key, 'a': action, 'q': new_q}):
+                self.save_q_table()
+
+    def _run(self, coro):
+        """Run a coroutine on the scraper's event loop and block until it finishes"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="rl-scraper-loop", daemon=True)
+                self._loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _get_browser(self):
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if self._browser is not None and not self._browser.is_connected():
+                # Chromium crashed or was closed; launch a new one rather than failing every scrape
+                logger.warning("Shared Chromium browser disconnected, relaunching")
+                self._browser = None
+            if self._browser is None:
+                # Reused across attempts so a failed launch doesn't leave a driver process behind
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                logger.info("Launched shared Chromium browser")
+        return self._browser
+
+    def _get_http(self) -> httpx.AsyncClient:
+        # Created on first use so the connection pool belongs to the scraper's loop
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                http2=True,
+                timeout=10,
+                follow_redirects=True
+            )
+        return self._http
+
+    def _get_curl(self):
+        # Created on first use, like the httpx client, so it belongs to the scraper's loop
+        if self._curl is None:
+            self._curl = CurlAsyncSession(impersonate="chrome124", timeout=10)
+        return self._curl
+
+    async def aclose(self):
+        """Shut down the shared browser and HTTP client; must run on the scraper's event loop"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._curl is not None:
+            await self._curl.close()
+            self._curl = None
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        """Shut down the shared browser and the scraper's event loop"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop_thread.join()
+        loop.close()
+
+    def _extract_text(self, html: str) -> str:
+        tree = self._parse_tree(html)
+
+        # Remove script and style elements, keeping the text that follows them
+        etree.strip_elements(tree, "script", "style", with_tail=False)
+
+        return tree.text_content()
+
+    async def execute_scraping_action(self, url: str, action: str, extract_text: bool = True,
+                                      screenshot: bool = False, log_errors: bool = True) -> Dict:
         start_time = time.time()
 
         try:
             if action == "playwright_full":
-                result = self._playwright_full_scrape(url)
+                result = await self._playwright_full_scrape(url, screenshot)
             elif action == "playwright_fast":
-                result = self._playwright_fast_scrape(url)
+                result = await self._playwright_fast_scrape(url)
             elif action == "playwright_js_wait":
-                result = self._playwright_js_wait_scrape(url)
+                result = await self._playwright_js_wait_scrape(url)
             elif action == "requests_simple":
-                result = self._requests_simple_scrape(url)
+                result = await self._requests_simple_scrape(url, extract_text)
+            elif action == "curl_cffi_impersonate":
+                result = await self._curl_cffi_scrape(url)
             else:
                 raise ValueError(f"Unknown action: {action}")
 
@@ -155,7 +355,11 @@ class RLScraper:
             return result
 
         except Exception as e:
-            logger.error(f"Scraping action {action} failed: {str(e)}")
+            # The state probe fails quietly; only a failure of the chosen action is an error
+            if log_errors:
+                logger.error(f"Scraping action {action} failed: {str(e)}")
+            else:
+                logger.debug(f"Scraping action {action} failed: {str(e)}")
             return {
                 "content": "",
                 "html": "",
@@ -165,102 +369,103 @@ class RLScraper:
                 "error": str(e)
             }
 
-    def _playwright_full_scrape(self, url: str) -> Dict:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-
-            page.goto(url, wait_until="load", timeout=30000)
-
-            screenshot_path = f"{self.screenshots_dir}/screenshot_{int(time.time())}.png"
-            page.screenshot(path=screenshot_path, full_page=True)
-
-            html = page.content()
-            soup = BeautifulSoup(html, "html.parser")
-
-            for script in soup(["script", "style"]):
-                script.decompose()
-
-            content = soup.get_text()
-
-            browser.close()
-
-            return {
-                "content": content,
-                "html": html,
-                "screenshot_path": screenshot_path
-            }
-
-    def _playwright_fast_scrape(self, url: str) -> Dict:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
+    async def _playwright_full_scrape(self, url: str, screenshot: bool = False) -> Dict:
+        browser = await self._get_browser()
+        # A fresh context per scrape is cheap and isolates cookies/storage between pages
+        context = await browser.new_context()
+        try:
+            page = await context.new_page()
+
+            await page.goto(url, wait_until="load", timeout=30000)
+
+            # Screenshots only earn reward on Wikisource pages; a viewport JPEG is far cheaper
+            # to paint and encode than a full-page PNG, and is taken while the HTML is read
+            if screenshot:
+                # Unique per scrape: concurrent batch scrapes can finish within the same second
+                screenshot_path = f"{self.screenshots_dir}/screenshot_{uuid.uuid4().hex}.jpg"
+                html, _ = await asyncio.gather(
+                    page.content(),
+                    page.screenshot(path=screenshot_path, type="jpeg", quality=60)
+                )
+            else:
+                screenshot_path = None
+                html = await page.content()
+        finally:
+            await context.close()
 
-            page.goto(url, timeout=15000)
+        return {
+            "content": self._extract_text(html),
+            "html": html,
+            "screenshot_path": screenshot_path
+        }
 
-            html = page.content()
-            soup = BeautifulSoup(html, "html.parser")
+    async def _playwright_fast_scrape(self, url: str) -> Dict:
+        browser = await self._get_browser()
+        context = await browser.new_context()
+        try:
+            page = await context.new_page()
 
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+            if self.fast_blocks_resources:
+                await page.route("**/*", _block_heavy_resources)
 
-            content = soup.get_text()
+            await page.goto(url, timeout=15000)
 
-            browser.close()
+            html = await page.content()
+        finally:
+            await context.close()
 
-            return {
-                "content": content,
-                "html": html,
-                "screenshot_path": None
-            }
+        return {
+            "content": self._extract_text(html),
+            "html": html,
+            "screenshot_path": None
+        }
 
-    def _playwright_js_wait_scrape(self, url: str) -> Dict:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
+    async def _playwright_js_wait_scrape(self, url: str) -> Dict:
+        browser = await self._get_browser()
+        context = await browser.new_context()
+        try:
+            page = await context.new_page()
 
-            page.goto(url, wait_until="networkidle", timeout=30000)
+            await page.goto(url, wait_until="networkidle", timeout=30000)
 
             # Wait for potential dynamic content
-            page.wait_for_timeout(2000)
+            await page.wait_for_timeout(2000)
 
-            html = page.content()
-            soup = BeautifulSoup(html, "html.parser")
+            html = await page.content()
+        finally:
+            await context.close()
 
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-
-            content = soup.get_text()
-
-            browser.close()
-
-            return {
-                "content": content,
-                "html": html,
-                "screenshot_path": None
-            }
+        return {
+            "content": self._extract_text(html),
+            "html": html,
+            "screenshot_path": None
+        }
 
-    def _requests_simple_scrape(self, url: str) -> Dict:
+    async def _requests_simple_scrape(self, url: str, extract_text: bool = True) -> Dict:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = await self._get_http().get(url, headers=headers, timeout=10)
         response.raise_for_status()
 
         html = response.text
-        soup = BeautifulSoup(html, "html.parser")
 
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
+        return {
+            # Callers that only need the page state skip the full text extraction
+            "content": self._extract_text(html) if extract_text else None,
+            "html": html,
+            "screenshot_path": None
+        }
+
+    async def _curl_cffi_scrape(self, url: str) -> Dict:
+        response = await self._get_curl().get(url)
+        response.raise_for_status()
 
-        content = soup.get_text()
+        html = response.text
 
         return {
-            "content": content,
+            "content": self._extract_text(html),
             "html": html,
             "screenshot_path": None
         }
@@ -269,16 +474,8 @@ class RLScraper:
         if not result["success"]:
             return -1.0
 
-        reward = 0.0
-        content_length = len(result["content"])
-
         # Reward based on content length
-        if content_length > 1000:
-            reward += 1.0
-        elif content_length > 500:
-            reward += 0.5
-        else:
-            reward -= 0.5
+        reward = REWARD_BY_LENGTH[bisect_left(REWARD_LENGTH_THRESHOLDS, len(result["content"]))]
 
         # Penalty for long execution time
         if result["execution_time"] > 10:
@@ -296,19 +493,8 @@ class RLScraper:
         if not result["success"]:
             return 1.0
 
-        content_length = len(result["content"])
-
         # Base score from content length
-        if content_length > 2000:
-            base_score = 5.0
-        elif content_length > 1000:
-            base_score = 4.0
-        elif content_length > 500:
-            base_score = 3.0
-        elif content_length > 100:
-            base_score = 2.0
-        else:
-            base_score = 1.0
+        base_score = QUALITY_BY_LENGTH[bisect_left(QUALITY_LENGTH_THRESHOLDS, len(result["content"]))]
 
         # Adjust for execution time
         if result["execution_time"] > 15:
@@ -319,33 +505,68 @@ class RLScraper:
         return max(1.0, min(5.0, base_score))
 
     def scrape_url(self, url: str, strategy: Optional[str] = None) -> Dict:
-        logger.info(f"Starting RL scrape of: {url}")
+        return self._run(self.scrape_url_async(url, strategy))
 
-        try:
-            response = requests.get(url, timeout=5)
-            initial_html = response.text
-        except:
-            initial_html = "<html><body>fallback</body></html>"
+    def scrape_batch(self, urls: List[str], strategy: Optional[str] = None, concurrency: int = 10) -> List:
+        return self._run(self.scrape_urls(urls, strategy, concurrency))
+
+    async def scrape_urls(self, urls: List[str], strategy: Optional[str] = None, concurrency: int = 10) -> List:
+        """Scrape many URLs concurrently against the shared browser.
 
-        # Simulate page variants for training
-        if random.random() > 0.7:  # 30% chance to use variant
-            initial_html = self.simulate_page_variants(initial_html)
+        Results are in input order; a URL whose scrape raised yields the exception instead of a dict.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(url: str) -> Dict:
+            async with semaphore:
+                return await self.scrape_url_async(url, strategy)
+
+        return await asyncio.gather(*(bounded(url) for url in urls), return_exceptions=True)
+
+    async def scrape_url_async(self, url: str, strategy: Optional[str] = None) -> Dict:
+        """Async scrape_url; must run on the scraper's event loop (see _run)"""
+        logger.info(f"Starting RL scrape of: {url}")
+
+        domain = urlparse(url).netloc
+        probe = None
+        cached = self._domain_state.get(domain)
+        if cached and time.monotonic() - cached[0] < self.domain_state_ttl:
+            state = cached[1]
+        else:
+            # The cheap fetch doubles as the state probe and, if requests_simple is chosen, as the scrape
+            probe = await self.execute_scraping_action(url, "requests_simple", extract_text=False, log_errors=False)
+            initial_html = probe["html"] or "<html><body>fallback</body></html>"
+            state = self.get_page_state(initial_html, url)
+            # A state read from the fallback placeholder says nothing about the site, so it isn't reused
+            if probe["success"]:
+                self._domain_state[domain] = (time.monotonic(), state)
+
+            # Simulate page variants for training
+            if self._rng.random() > 0.7:  # 30% chance to use variant
+                state = self.get_page_state(self.simulate_page_variants(initial_html), url)
 
-        state = self.get_page_state(initial_html, url)
         if strategy:
             action = strategy
         else:
             action = self.choose_action(state)
 
-        # Execute scraping
-        result = self.execute_scraping_action(url, action)
+        # Execute scraping, unless the probe already fetched the page the same way
+        if action == "requests_simple" and probe is not None:
+            result = probe
+            if not result["success"]:
+                logger.error(f"Scraping action {action} failed: {result['error']}")
+            if result["content"] is None:
+                result["content"] = self._extract_text(result["html"])
+        else:
+            result = await self.execute_scraping_action(url, action, screenshot=state.get("is_wikisource", False))
 
         # Calculate reward and quality
         reward = self.calculate_reward(result, state)
         quality_score = self.calculate_quality_score(result)
 
         # Update Q-table
-        self.update_q_value(state, action, reward)
+        state_key = self.state_to_key(state)
+        self.update_q_value_for_key(state_key, action, reward)
 
         # Log performance
         performance_record = {
@@ -359,17 +580,15 @@ class RLScraper:
             "success": result["success"]
         }
 
-        self.performance_history.append(performance_record)
-
-        # Keep only last 100 records
-        if len(self.performance_history) > 100:
-            self.performance_history = self.performance_history[-100:]
+        self._record_performance(performance_record)
 
         return {
             "content": result["content"],
             "html": result["html"],
             "screenshot_path": result.get("screenshot_path"),
             "strategy": action,
+            # Key of the state the action was chosen in, for crediting later feedback
+            "state_key": state_key,
             "quality_score": quality_score,
             "rl_reward": reward,
             "execution_time": result["execution_time"],
@@ -395,15 +614,24 @@ class RLScraper:
     def is_healthy(self) -> bool:
         return len(self.q_table) >= 0  # Basic health check
 
+    def _record_performance(self, record: Dict):
+        history = self.performance_history
+        if len(history) == history.maxlen:
+            # The append below evicts the oldest record
+            oldest = history[0]
+            self._success_total -= oldest["success"]
+            self._quality_total -= oldest["quality_score"]
+        history.append(record)
+        self._success_total += record["success"]
+        self._quality_total += record["quality_score"]
+
     def get_performance_stats(self) -> Dict:
         if not self.performance_history:
             return {"total_scrapes": 0, "success_rate": 0.0, "avg_quality": 0.0}
 
         total_scrapes = len(self.performance_history)
-        successful_scrapes = sum(1 for record in self.performance_history if record["success"])
-        success_rate = successful_scrapes / total_scrapes if total_scrapes > 0 else 0.0
-
-        avg_quality = sum(record["quality_score"] for record in self.performance_history) / total_scrapes
+        success_rate = self._success_total / total_scrapes
+        avg_quality = self._quality_total / total_scrapes
 
         return {
             "total_scrapes": total_scrapes,
@@ -1,9 +1,12 @@
 import streamlit as st
 import os
-import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import zlib
+import heapq
 from datetime import datetime
 
 # Import your existing modules
@@ -16,6 +19,13 @@ from config_manager import ConfigManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Repeat scrapes of the same URL and strategy within this window reuse the earlier result
+SCRAPE_CACHE_TTL = 300
+
+# The Q-table monitor groups states into planes and shows only the strongest states of each
+QTABLE_PLANES = 16
+QTABLE_TOP_K = 10
+
 # Page configuration
 st.set_page_config(
     page_title="Smart Book Publisher",
@@ -29,10 +39,6 @@ def init_session_state():
     """Initialize all session state variables"""
     if 'initialized' not in st.session_state:
         st.session_state.initialized = True
-        st.session_state.scraper = None
-        st.session_state.rewriter = None
-        st.session_state.storage = None
-        st.session_state.config = None
         st.session_state.content_history = []
         st.session_state.current_content = None
         st.session_state.processing = False
@@ -56,6 +62,31 @@ def get_components():
         st.error(f"Failed to initialize components: {str(e)}")
         st.stop()
 
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Worker threads for scrapes and rewrites, so the script thread only waits on them"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="streamlit-job")
+
+def wait_for_job(future: Future, status, label: str):
+    """Poll a background job, refreshing the status label so a rerun can interrupt the wait"""
+    start = time.monotonic()
+    while not future.done():
+        status.update(label=f"{label} ({time.monotonic() - start:.0f}s)")
+        time.sleep(0.1)
+    return future.result()
+
+@st.cache_resource
+def get_scrape_cache() -> Tuple[Dict, threading.Lock]:
+    """(url, strategy) -> (time.monotonic(), result) for recent successful scrapes, plus the lock
+    guarding it across sessions"""
+    return {}, threading.Lock()
+
+@st.cache_data(ttl=2.0, show_spinner=False)
+def get_content_index() -> list:
+    """Content index entries, shared by the pages that list content within one rerun"""
+    _, _, _, storage = get_components()
+    return list(storage.list_content())
+
 # Error handling decorator
 def handle_errors(func):
     """Decorator to handle errors gracefully"""
@@ -73,14 +104,10 @@ def main():
     """Main Streamlit application"""
     init_session_state()
     
-    # Get cached components
-    config, scraper, rewriter, storage = get_components()
-    
-    # Store in session state
-    st.session_state.config = config
-    st.session_state.scraper = scraper
-    st.session_state.rewriter = rewriter
-    st.session_state.storage = storage
+    # Get cached components; they are the same objects on every rerun, so store them once
+    if st.session_state.get('config') is None:
+        config, scraper, rewriter, storage = get_components()
+        st.session_state.update(config=config, scraper=scraper, rewriter=rewriter, storage=storage)
     
     # App header
     st.title("🤖 Smart Book Publisher")
@@ -91,7 +118,7 @@ def main():
         st.header("Navigation")
         page = st.selectbox(
             "Choose a page:",
-            ["🏠 Home", "🔍 Scrape Content", "✍️ AI Rewriter", "📊 Q-Table Monitor", "📈 Analytics"],
+            list(PAGES),
             key="page_selector"
         )
         
@@ -100,16 +127,7 @@ def main():
         check_api_key_status()
     
     # Route to appropriate page
-    if page == "🏠 Home":
-        show_home_page()
-    elif page == "🔍 Scrape Content":
-        show_scraping_page()
-    elif page == "✍️ AI Rewriter":
-        show_rewriter_page()
-    elif page == "📊 Q-Table Monitor":
-        show_qtable_monitor()
-    elif page == "📈 Analytics":
-        show_analytics_page()
+    PAGES.get(page, show_home_page)()
 
 def check_api_key_status():
     """Check and display API key status"""
@@ -152,25 +170,12 @@ def show_home_page():
 def show_system_stats():
     """Display system statistics"""
     try:
-        # Check Q-table files
-        rewriter_file = "data/rewriter_q_table.json"
-        scraper_file = "data/scraper_q_table.json"
-        
-        rewriter_states = 0
-        scraper_states = 0
-        
-        if os.path.exists(rewriter_file):
-            with open(rewriter_file, 'r') as f:
-                rewriter_q = json.load(f)
-                rewriter_states = len(rewriter_q)
-        
-        if os.path.exists(scraper_file):
-            with open(scraper_file, 'r') as f:
-                scraper_q = json.load(f)
-                scraper_states = len(scraper_q)
+        # The live agents hold the snapshot plus any journaled updates
+        rewriter_states = len(st.session_state.rewriter.q_table)
+        scraper_states = len(st.session_state.scraper.q_table)
         
         # Content count
-        content_count = len([f for f in os.listdir('data/content') if f.endswith('.json')])
+        content_count = get_content_count()
         
         st.metric("Content Processed", content_count)
         st.metric("Rewriter States", rewriter_states)
@@ -201,7 +206,7 @@ def show_scraping_page():
             st.write("Strategy")
             strategy = st.selectbox(
                 "Scraping Strategy",
-                ["auto", "playwright_full", "playwright_fast", "playwright_js_wait", "requests_simple"],
+                ["auto"] + st.session_state.scraper.actions,
                 help="Choose 'auto' for RL-optimized selection"
             )
         
@@ -211,52 +216,81 @@ def show_scraping_page():
         if not url.startswith(('http://', 'https://')):
             st.error("Please enter a valid URL starting with http:// or https://")
             return
-        
-        # Show progress
-        with st.spinner("Scraping content..."):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            for i in range(100):
-                time.sleep(0.01)
-                progress_bar.progress(i + 1)
-                status_text.text(f"Scraping... {i+1}%")
-            
-            # Perform scraping
-            result = perform_scraping(url, strategy)
-            
-            progress_bar.empty()
-            status_text.empty()
-        
+    elif st.session_state.get("scrape_job"):
+        # Resume waiting on a scrape started before the last rerun
+        url, strategy, _ = st.session_state.scrape_job
+    else:
+        return
+    
+    # Show progress while the scrape actually runs
+    with st.status("Scraping content...", expanded=True) as status:
+        result = perform_scraping(url, strategy, status)
         if result:
-            display_scraping_results(result)
+            status.update(label="Scraping complete", state="complete", expanded=False)
+        else:
+            status.update(label="Scraping failed", state="error")
+    
+    if result:
+        display_scraping_results(result)
+
+def store_scrape_result(storage: ContentStorage, url: str, result: Dict):
+    """Store a successful scrape and record its content_id on the result"""
+    metadata = {
+        "source_url": url,
+        "scrape_action": result["strategy"],
+        "scrape_state": result["state_key"],
+        "phase": "raw"
+    }
+    
+    result["content_id"] = storage.store_content(
+        result["content"], 
+        content_type="raw", 
+        metadata=metadata
+    )
 
-def perform_scraping(url: str, strategy: str) -> Optional[Dict]:
+def run_scraping(scraper: RLScraper, storage: ContentStorage, url: str, strategy: str) -> Dict:
+    """Scrape and store one URL; runs on a worker thread, so it must not call st.*"""
+    if strategy == "auto":
+        result = scraper.scrape_url(url)
+    else:
+        result = scraper.scrape_url(url, strategy=strategy)
+    
+    if result.get("success"):
+        store_scrape_result(storage, url, result)
+    return result
+
+def perform_scraping(url: str, strategy: str, status) -> Optional[Dict]:
     """Perform the actual scraping operation"""
     try:
-        scraper = st.session_state.scraper
+        scrape_cache, scrape_cache_lock = get_scrape_cache()
+        key = (url, strategy)
+        with scrape_cache_lock:
+            cached = scrape_cache.get(key)
+        if cached and time.monotonic() - cached[0] < SCRAPE_CACHE_TTL:
+            # Already scraped and stored; skip the browser round trip
+            return cached[1]
+        
+        job = st.session_state.get("scrape_job")
+        if job is None or job[:2] != key:
+            future = get_executor().submit(
+                run_scraping, st.session_state.scraper, st.session_state.storage, url, strategy
+            )
+            job = st.session_state.scrape_job = (url, strategy, future)
         
-        if strategy == "auto":
-            result = scraper.scrape_url(url)
-        else:
-            result = scraper.scrape_url(url, strategy=strategy)
+        try:
+            result = wait_for_job(job[2], status, "Scraping content...")
+        finally:
+            if job[2].done():
+                st.session_state.scrape_job = None
         
         if result.get("success"):
-            # Store the content
-            metadata = {
-                "source_url": url,
-                "scrape_action": result["strategy"],
-                "scrape_state": scraper.state_to_key(scraper.get_page_state(result["html"], url)),
-                "phase": "raw"
-            }
+            get_content_index.clear()
             
-            content_id = st.session_state.storage.store_content(
-                result["content"], 
-                content_type="raw", 
-                metadata=metadata
-            )
-            
-            result["content_id"] = content_id
+            now = time.monotonic()
+            with scrape_cache_lock:
+                for stale_key in [k for k, (stored_at, _) in scrape_cache.items() if now - stored_at >= SCRAPE_CACHE_TTL]:
+                    del scrape_cache[stale_key]
+                scrape_cache[key] = (now, result)
             return result
         else:
             st.error(f"Scraping failed: {result.get('error', 'Unknown error')}")
@@ -266,6 +300,86 @@ def perform_scraping(url: str, strategy: str) -> Optional[Dict]:
         st.error(f"Error during scraping: {str(e)}")
         return None
 
+@handle_errors
+def show_batch_page():
+    """Display the batch scraping page"""
+    st.header("🧺 Batch Scraping")
+    
+    with st.form("batch_form"):
+        st.subheader("URLs to Scrape")
+        
+        uploaded = st.file_uploader("URL list (one per line)", type=["txt"])
+        pasted = st.text_area("Or paste URLs", height=150)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            strategy = st.selectbox(
+                "Scraping Strategy",
+                ["auto"] + st.session_state.scraper.actions,
+                help="Choose 'auto' for RL-optimized selection"
+            )
+        
+        with col2:
+            concurrency = st.slider("Concurrent scrapes", 1, 50, 10)
+        
+        submitted = st.form_submit_button("🚀 Scrape All", use_container_width=True)
+    
+    if submitted:
+        lines = pasted.splitlines()
+        if uploaded is not None:
+            lines += uploaded.getvalue().decode("utf-8", errors="ignore").splitlines()
+        # Keep input order, drop duplicates and anything that isn't an http(s) URL
+        urls = list(dict.fromkeys(line.strip() for line in lines if line.strip().startswith(('http://', 'https://'))))
+        if not urls:
+            st.error("Please provide at least one URL starting with http:// or https://")
+            return
+        future = get_executor().submit(
+            run_batch_scraping, st.session_state.scraper, st.session_state.storage, urls, strategy, concurrency
+        )
+        st.session_state.batch_job = (urls, future)
+    elif st.session_state.get("batch_job"):
+        # Resume waiting on a batch started before the last rerun
+        urls, future = st.session_state.batch_job
+    else:
+        return
+    
+    with st.status(f"Scraping {len(urls)} URLs...", expanded=True) as status:
+        try:
+            rows = wait_for_job(future, status, f"Scraping {len(urls)} URLs...")
+        finally:
+            if future.done():
+                st.session_state.batch_job = None
+        succeeded = sum(row["Success"] for row in rows)
+        status.update(label=f"Scraped {succeeded} of {len(rows)} URLs", state="complete", expanded=False)
+    
+    get_content_index.clear()
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
+def run_batch_scraping(scraper: RLScraper, storage: ContentStorage, urls: List[str], strategy: str,
+                       concurrency: int) -> List[Dict]:
+    """Scrape and store many URLs concurrently; runs on a worker thread, so it must not call st.*"""
+    # One gather over the scraper's event loop, bounded by a semaphore, against the shared browser
+    results = scraper.scrape_batch(urls, strategy=None if strategy == "auto" else strategy, concurrency=concurrency)
+    
+    rows = []
+    # Make the whole batch durable with one fsync pass
+    with storage.batch():
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                result = {"success": False, "error": str(result)}
+            if result.get("success"):
+                store_scrape_result(storage, url, result)
+            rows.append({
+                "URL": url,
+                "Success": bool(result.get("success")),
+                "Strategy": result.get("strategy", ""),
+                "Quality": result.get("quality_score"),
+                "Content ID": result.get("content_id", ""),
+                "Error": result.get("error", "")
+            })
+    return rows
+
 def display_scraping_results(result: Dict):
     """Display scraping results"""
     st.success("✅ Scraping completed successfully!")
@@ -328,7 +442,7 @@ def show_rewriter_page():
             selected_content = st.selectbox(
                 "Choose content:",
                 content_options,
-                format_func=lambda x: f"ID: {x['id'][:8]}... | {x['source_url'][:50]}..."
+                format_func=lambda x: x['label']
             )
         
         with col2:
@@ -341,73 +455,89 @@ def show_rewriter_page():
         submitted = st.form_submit_button("🤖 Start Rewriting", use_container_width=True)
     
     if submitted and selected_content:
-        # Show progress
-        with st.spinner("AI is rewriting content..."):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            for i in range(100):
-                time.sleep(0.02)
-                progress_bar.progress(i + 1)
-                status_text.text(f"Rewriting... {i+1}%")
-            
-            # Perform rewriting
-            result = perform_rewriting(selected_content, strategy)
-            
-            progress_bar.empty()
-            status_text.empty()
-        
+        # Only the chosen record's body is read from disk
+        record = st.session_state.storage.load_content(selected_content['id'])
+        if record is None:
+            st.error(f"Content {selected_content['id'][:8]} could not be found")
+            return
+        selected_content = {**selected_content, 'content': record['content']}
+    elif st.session_state.get("rewrite_job"):
+        # Resume waiting on a rewrite started before the last rerun
+        selected_content, strategy, _ = st.session_state.rewrite_job
+    elif st.session_state.get("last_rewrite"):
+        # Keep showing the latest rewrite so its feedback form can be submitted
+        display_rewriting_results(*st.session_state.last_rewrite)
+        return
+    else:
+        return
+    
+    # Show progress while the rewrite actually runs
+    with st.status("AI is rewriting content...", expanded=True) as status:
+        result = perform_rewriting(selected_content, strategy, status)
         if result:
-            display_rewriting_results(result, selected_content)
+            status.update(label="Rewriting complete", state="complete", expanded=False)
+        else:
+            status.update(label="Rewriting failed", state="error")
+    
+    if result:
+        st.session_state.last_rewrite = (result, selected_content)
+        display_rewriting_results(result, selected_content)
 
 def get_content_options() -> list:
     """Get available content options"""
     try:
-        content_dir = "data/content"
-        content_files = [f for f in os.listdir(content_dir) if f.endswith('.json')]
-        
+        # Listing fields come from the content index; bodies are loaded once a record is chosen
         content_options = []
-        for file in content_files:
-            try:
-                with open(os.path.join(content_dir, file), 'r') as f:
-                    data = json.load(f)
-                    content_options.append({
-                        'id': data['id'],
-                        'content': data['content'],
-                        'source_url': data['metadata'].get('source_url', 'Unknown'),
-                        'type': data['type']
-                    })
-            except Exception as e:
-                logger.warning(f"Error reading {file}: {str(e)}")
-        
+        for entry in get_content_index():
+            source_url = entry['source_url'] or 'Unknown'
+            content_options.append({
+                'id': entry['id'],
+                'source_url': source_url,
+                'type': entry['type'],
+                # Built once here rather than by format_func on every dropdown render
+                'label': f"ID: {entry['id'][:8]}... | {source_url[:50]}..."
+            })
         return content_options
     except Exception as e:
         st.error(f"Error loading content options: {str(e)}")
         return []
 
-def perform_rewriting(content_data: Dict, strategy: str) -> Optional[Dict]:
+def run_rewriting(rewriter: AIRewriter, storage: ContentStorage, content_data: Dict, strategy: str) -> Dict:
+    """Rewrite and store one record; runs on a worker thread, so it must not call st.*"""
+    result = rewriter.rewrite_content(content_data['content'], strategy=strategy)
+    
+    # Store the rewritten content
+    metadata = {
+        "parent_id": content_data['id'],
+        "rewrite_action": result["strategy"],
+        "rewrite_state": result.get("state_key", "unknown"),
+        "phase": "rewrite"
+    }
+    
+    result["content_id"] = storage.store_content(
+        result["rewritten_content"], 
+        content_type="rewrite", 
+        metadata=metadata
+    )
+    return result
+
+def perform_rewriting(content_data: Dict, strategy: str, status) -> Optional[Dict]:
     """Perform the actual rewriting operation"""
     try:
-        rewriter = st.session_state.rewriter
-        content = content_data['content']
-        
-        result = rewriter.rewrite_content(content, strategy=strategy)
-        
-        # Store the rewritten content
-        metadata = {
-            "parent_id": content_data['id'],
-            "rewrite_action": result["strategy"],
-            "rewrite_state": result.get("state_key", "unknown"),
-            "phase": "rewrite"
-        }
-        
-        content_id = st.session_state.storage.store_content(
-            result["rewritten_content"], 
-            content_type="rewrite", 
-            metadata=metadata
-        )
+        job = st.session_state.get("rewrite_job")
+        if job is None or (job[0]['id'], job[1]) != (content_data['id'], strategy):
+            future = get_executor().submit(
+                run_rewriting, st.session_state.rewriter, st.session_state.storage, content_data, strategy
+            )
+            job = st.session_state.rewrite_job = (content_data, strategy, future)
         
-        result["content_id"] = content_id
+        try:
+            result = wait_for_job(job[2], status, "AI is rewriting content...")
+        finally:
+            if job[2].done():
+                st.session_state.rewrite_job = None
+        
+        get_content_index.clear()
         return result
         
     except Exception as e:
@@ -453,31 +583,28 @@ def display_rewriting_results(result: Dict, original_content: Dict):
             comments = st.text_area("Comments (optional)", height=100)
         
         if st.form_submit_button("Submit Feedback"):
-            submit_feedback(result["content_id"], rating, comments)
+            submit_feedback(
+                result["content_id"], rating, comments,
+                phase="rewrite", action=result["strategy"], state_key=result.get("state_key")
+            )
 
-def submit_feedback(content_id: str, rating: int, comments: str):
-    """Submit feedback for content"""
+def submit_feedback(content_id: str, rating: int, comments: str, phase: str, action: Optional[str],
+                    state_key: Any):
+    """Submit feedback for content; the caller passes the action and state it already holds"""
     try:
         # Store feedback
         st.session_state.storage.store_feedback(content_id, rating, comments)
         
         # Update RL models
-        record_path = os.path.join("data", "content", f"{content_id}.json")
-        if os.path.exists(record_path):
-            with open(record_path, "r") as f:
-                record = json.load(f)
-            
-            meta = record["metadata"]
-            phase = meta.get("phase", "rewrite")
-            reward = (rating - 3) / 2
-            
+        reward = (rating - 3) / 2
+        if action and state_key is not None:
             if phase == "rewrite":
-                action = meta.get("rewrite_action")
-                state_key = meta.get("rewrite_state")
-                if action and state_key:
-                    st.session_state.rewriter.update_q_value(state_key, action, reward)
-            
-            st.success(f"✅ Feedback submitted! Reward: {reward:+.2f}")
+                st.session_state.rewriter.update_q_value(state_key, action, reward)
+            elif phase == "raw":
+                scraper = st.session_state.scraper
+                scraper.update_q_value_for_key(scraper.coerce_state_key(state_key), action, reward)
+        
+        st.success(f"✅ Feedback submitted! Reward: {reward:+.2f}")
         
     except Exception as e:
         st.error(f"Error submitting feedback: {str(e)}")
@@ -490,31 +617,45 @@ def show_qtable_monitor():
     
     with col1:
         st.subheader("🤖 AI Rewriter Q-Table")
-        display_qtable("data/rewriter_q_table.json", "rewriter")
+        display_qtable(st.session_state.rewriter.q_table, "rewriter")
     
     with col2:
         st.subheader("🔍 Scraper Q-Table")
-        display_qtable("data/scraper_q_table.json", "scraper")
+        display_qtable(st.session_state.scraper.q_table, "scraper")
+
+def _qtable_row(state, actions: Dict) -> Dict:
+    return {"state": str(state), **{action: round(q_value, 3) for action, q_value in actions.items()}}
 
-def display_qtable(file_path: str, table_type: str):
+def display_qtable(q_table: Dict, table_type: str):
     """Display Q-table contents"""
     try:
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                q_table = json.load(f)
+        if q_table:
+            st.success(f"✅ {len(q_table)} states learned")
             
-            if q_table:
-                st.success(f"✅ {len(q_table)} states learned")
-                
-                # Show Q-table data
-                for state, actions in q_table.items():
-                    with st.expander(f"State: {state}"):
-                        for action, q_value in actions.items():
-                            st.write(f"**{action}**: {q_value:.3f}")
-            else:
-                st.info("No learning data yet")
+            # Direct lookup instead of scanning every state
+            query = st.text_input("Find state", key=f"{table_type}_state_search").strip()
+            if query:
+                actions = q_table.get(query)
+                if actions is None and query.isdigit():
+                    actions = q_table.get(int(query))
+                if actions is None:
+                    st.info("State not found")
+                else:
+                    st.dataframe([_qtable_row(query, actions)], hide_index=True)
+            
+            # Stable bucketing (unlike hash(), crc32 doesn't change between runs)
+            planes = [[] for _ in range(QTABLE_PLANES)]
+            for state, actions in list(q_table.items()):
+                planes[zlib.crc32(str(state).encode()) % QTABLE_PLANES].append((state, actions))
+            
+            for plane, items in enumerate(planes):
+                if not items:
+                    continue
+                top = heapq.nlargest(QTABLE_TOP_K, items, key=lambda item: max(map(abs, item[1].values())))
+                with st.expander(f"Plane {plane}: top {len(top)} of {len(items)} states"):
+                    st.dataframe([_qtable_row(state, actions) for state, actions in top], hide_index=True)
         else:
-            st.warning("Q-table file not found")
+            st.info("No learning data yet")
     
     except Exception as e:
         st.error(f"Error loading Q-table: {str(e)}")
@@ -540,21 +681,14 @@ def show_analytics_page():
 def get_content_count() -> int:
     """Get total content count"""
     try:
-        return len([f for f in os.listdir('data/content') if f.endswith('.json')])
+        return len(get_content_index())
     except:
         return 0
 
 def get_average_quality() -> float:
     """Get average quality score"""
     try:
-        feedback_file = "data/feedback.json"
-        if os.path.exists(feedback_file):
-            with open(feedback_file, 'r') as f:
-                feedback_data = json.load(f)
-            
-            if feedback_data:
-                ratings = [item['rating'] for item in feedback_data]
-                return sum(ratings) / len(ratings)
+        return st.session_state.storage.average_rating()
     except:
         pass
     return 0.0
@@ -563,16 +697,8 @@ def get_learning_progress() -> float:
     """Get learning progress percentage"""
     try:
         # Simple metric based on number of states learned
-        rewriter_states = 0
-        scraper_states = 0
-        
-        if os.path.exists("data/rewriter_q_table.json"):
-            with open("data/rewriter_q_table.json", 'r') as f:
-                rewriter_states = len(json.load(f))
-        
-        if os.path.exists("data/scraper_q_table.json"):
-            with open("data/scraper_q_table.json", 'r') as f:
-                scraper_states = len(json.load(f))
+        rewriter_states = len(st.session_state.rewriter.q_table)
+        scraper_states = len(st.session_state.scraper.q_table)
         
         # Normalize to percentage (max 100)
         return min(100, (rewriter_states + scraper_states) * 10)
@@ -582,61 +708,91 @@ def get_learning_progress() -> float:
 def show_recent_activity():
     """Show recent content activity"""
     try:
-        content_dir = "data/content"
-        content_files = [f for f in os.listdir(content_dir) if f.endswith('.json')]
-        
-        # Sort by modification time
-        content_files.sort(key=lambda x: os.path.getmtime(os.path.join(content_dir, x)), reverse=True)
-        
-        # Show recent 5 items
-        for file in content_files[:5]:
-            try:
-                with open(os.path.join(content_dir, file), 'r') as f:
-                    data = json.load(f)
-                
-                with st.expander(f"ID: {data['id'][:8]}... | {data['type']}"):
-                    st.write(f"**Type**: {data['type']}")
-                    st.write(f"**Timestamp**: {data['timestamp']}")
+        # The index is in write order, so the most recent records are at the end
+        recent = get_content_index()[:-6:-1]
+        if not recent:
+            st.info("No content yet")
+            return
+        
+        # One table for the recent 5 items, built from the index alone
+        st.dataframe(
+            [
+                {
+                    "ID": entry['id'][:8],
+                    "Type": entry['type'],
+                    "Timestamp": entry['timestamp'],
+                    "Source": entry['source_url'] or ""
+                }
+                for entry in recent
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        # Only the record the user asks about is loaded in full
+        selected = st.selectbox(
+            "Details",
+            [None] + [entry['id'] for entry in recent],
+            format_func=lambda content_id: "Select a record..." if content_id is None else content_id[:8]
+        )
+        if selected:
+            data = st.session_state.storage.load_content(selected)
+            if data is None:
+                st.warning(f"Error reading {selected}")
+            else:
+                with st.expander(f"ID: {data['id'][:8]}... | {data['type']}", expanded=True):
                     if 'source_url' in data['metadata']:
                         st.write(f"**Source**: {data['metadata']['source_url']}")
                     st.write(f"**Content**: {data['content'][:100]}...")
-            except Exception as e:
-                st.warning(f"Error reading {file}: {str(e)}")
     
     except Exception as e:
         st.error(f"Error loading recent activity: {str(e)}")
 
+# Sidebar label -> page renderer, in navigation order
+PAGES = {
+    "🏠 Home": show_home_page,
+    "🔍 Scrape Content": show_scraping_page,
+    "🧺 Batch": show_batch_page,
+    "✍️ AI Rewriter": show_rewriter_page,
+    "📊 Q-Table Monitor": show_qtable_monitor,
+    "📈 Analytics": show_analytics_page
+}
+
 # Custom CSS for better styling
+CUSTOM_CSS = """
+<style>
+.stApp {
+    background-color: #f8f9fa;
+}
+.stButton > button {
+    background-color: #007bff;
+    color: white;
+    border: none;
+    border-radius: 5px;
+    padding: 10px 20px;
+    font-weight: bold;
+}
+.stButton > button:hover {
+    background-color: #0056b3;
+}
+.stSuccess {
+    background-color: #d4edda;
+    border: 1px solid #c3e6cb;
+    border-radius: 5px;
+}
+.stError {
+    background-color: #f8d7da;
+    border: 1px solid #f5c6cb;
+    border-radius: 5px;
+}
+</style>
+"""
+
 def load_css():
     """Load custom CSS"""
-    st.markdown("""
-    <style>
-    .stApp {
-        background-color: #f8f9fa;
-    }
-    .stButton > button {
-        background-color: #007bff;
-        color: white;
-        border: none;
-        border-radius: 5px;
-        padding: 10px 20px;
-        font-weight: bold;
-    }
-    .stButton > button:hover {
-        background-color: #0056b3;
-    }
-    .stSuccess {
-        background-color: #d4edda;
-        border: 1px solid #c3e6cb;
-        border-radius: 5px;
-    }
-    .stError {
-        background-color: #f8d7da;
-        border: 1px solid #f5c6cb;
-        border-radius: 5px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Streamlit drops elements a rerun doesn't emit, so this can't be skipped after the
+    # first run; st.html injects the style block as-is, without a markdown parse
+    st.html(CUSTOM_CSS)
 
 if __name__ == "__main__":
     load_css()